@@ -1,3 +1,6 @@
-from llm_tools_readonly_fs.llm_tools_readonly_fs import ReadonlyFsTools
+from llm_tools_readonly_fs.llm_tools_readonly_fs import (
+    AsyncReadonlyFsTools,
+    ReadonlyFsTools,
+)
 
-__all__ = ["ReadonlyFsTools"]
+__all__ = ["AsyncReadonlyFsTools", "ReadonlyFsTools"]
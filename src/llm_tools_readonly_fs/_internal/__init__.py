@@ -0,0 +1 @@
+"""Internal implementation classes - not part of public API."""
@@ -0,0 +1,55 @@
+"""Windowed file reading that only consumes the requested lines."""
+
+from __future__ import annotations
+
+import itertools
+from pathlib import Path
+from typing import List
+
+from readonly_fs_tools import FileReadResult, FileWindow, OutputBudget
+from readonly_fs_tools._internal.file_reader import StreamingFileReader
+from readonly_fs_tools.budget import BudgetExceeded
+
+# Large reads keep the number of syscalls low when skipping to a line offset
+READ_BUFFER_SIZE = 128 * 1024
+
+
+class BufferedFileReader(StreamingFileReader):
+    """Windowed file reading with large buffers and C-level line skipping."""
+
+    def read_window(
+        self,
+        file: Path,
+        window: FileWindow,
+        budget: OutputBudget,
+    ) -> FileReadResult:
+        """Read file window with budget constraints."""
+        self.sandbox.require_allowed(file)
+
+        lines: List[str] = []
+        truncated = False
+
+        try:
+            budget.debit(len(file.as_posix()))
+            with open(
+                file,
+                "r",
+                encoding="utf-8",
+                errors="ignore",
+                buffering=READ_BUFFER_SIZE,
+            ) as f:
+                end = window.line_offset + window.line_count
+                for line in itertools.islice(f, window.line_offset, end):
+                    budget.debit(len(line))
+                    lines.append(line)
+
+        except BudgetExceeded:
+            truncated = True
+
+        actual_window = FileWindow(
+            line_offset=window.line_offset, line_count=len(lines)
+        )
+
+        return FileReadResult(
+            contents="".join(lines), truncated=truncated, actual_window=actual_window
+        )
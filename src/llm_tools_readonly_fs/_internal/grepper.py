@@ -0,0 +1,120 @@
+"""Grep that searches files concurrently on a thread pool."""
+
+from __future__ import annotations
+
+import collections
+import contextlib
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Deque, Iterable, Iterator, List
+
+from readonly_fs_tools import (
+    FileContent,
+    GlobPattern,
+    GrepOutput,
+    Grepper,
+    OutputBudget,
+    RegexPattern,
+)
+from readonly_fs_tools._internal.path_enumerator import FilesystemPathEnumerator
+from readonly_fs_tools._internal.regex_searcher import StreamingRegexSearcher
+from readonly_fs_tools.budget import BudgetExceeded
+
+DEFAULT_GREP_WORKERS = min(32, (os.cpu_count() or 1) * 2)
+
+
+class ParallelGrepper(Grepper):
+    """Grepper that reads and searches several files at once.
+
+    File reads block outside the GIL and `re` releases it while scanning large
+    buffers, so a handful of threads keeps the disk and the regex engine busy
+    at the same time. Matches are still reported in path order and charged to
+    the budget by the calling thread, so output is identical to a sequential
+    search.
+    """
+
+    def __init__(
+        self,
+        path_enum: FilesystemPathEnumerator,
+        regex_searcher: StreamingRegexSearcher,
+        workers: int = DEFAULT_GREP_WORKERS,
+    ) -> None:
+        super().__init__(path_enum=path_enum, regex_searcher=regex_searcher)
+        self.workers = workers
+
+    def grep(
+        self,
+        search_regex: RegexPattern,
+        glob_patterns: List[GlobPattern],
+        budget: OutputBudget,
+    ) -> GrepOutput:
+        """Search for regex pattern within files matching glob patterns."""
+        matches = []
+        truncated = False
+
+        with contextlib.closing(
+            self.iter_matches(search_regex, glob_patterns)
+        ) as all_matches:
+            for match in all_matches:
+                try:
+                    budget.debit(len(match.model_dump_json()))
+                except BudgetExceeded:
+                    truncated = True
+                    break
+                matches.append(match)
+
+        return GrepOutput(matches=matches, truncated=truncated)
+
+    def iter_matches(
+        self, search_regex: RegexPattern, glob_patterns: List[GlobPattern]
+    ) -> Iterator[FileContent]:
+        """Yield matches in path order as the files are searched.
+
+        Close the iterator when stopping early, to cancel searches still queued.
+        """
+        file_paths = self.path_enum.iter_paths(glob_patterns)
+        with contextlib.closing(
+            self._iter_file_matches(search_regex, file_paths)
+        ) as file_matches:
+            for matches_in_file in file_matches:
+                yield from matches_in_file
+
+    def _search_file(
+        self, file_path: Path, search_regex: RegexPattern
+    ) -> List[FileContent]:
+        """Collect the matches in one file, treating unreadable files as empty."""
+        try:
+            return list(self.regex_searcher.iter_matches(file_path, search_regex))
+        except Exception:
+            # Continue to next file if this one fails
+            return []
+
+    def _iter_file_matches(
+        self, search_regex: RegexPattern, file_paths: Iterable[Path]
+    ) -> Iterator[List[FileContent]]:
+        """Yield the matches of each file, in order, searching ahead in threads.
+
+        At most two files per worker are in flight, so when the caller stops
+        early (once the budget runs out) little work is wasted and the
+        remaining queued searches are cancelled.
+        """
+        if self.workers <= 1:
+            for file_path in file_paths:
+                yield self._search_file(file_path, search_regex)
+            return
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            pending: Deque[Future[List[FileContent]]] = collections.deque()
+            try:
+                for file_path in file_paths:
+                    pending.append(
+                        executor.submit(self._search_file, file_path, search_regex)
+                    )
+                    if len(pending) >= 2 * self.workers:
+                        yield pending.popleft().result()
+                while pending:
+                    yield pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
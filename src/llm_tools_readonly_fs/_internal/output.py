@@ -0,0 +1,87 @@
+"""Incremental rendering of tool output within the output limit."""
+
+from __future__ import annotations
+
+import io
+from typing import Callable, Iterable, TypeVar
+
+from readonly_fs_tools import FileContent, ViewOutput
+
+T = TypeVar("T")
+
+
+class BoundedStringBuilder:
+    """Joins text fragments with a separator, up to a fixed number of characters.
+
+    A fragment that would take the text past the limit is refused and marks the
+    builder as truncated, so callers can stop producing fragments right away.
+    """
+
+    def __init__(self, limit: int, separator: str = ", ") -> None:
+        self.limit = limit
+        self.size = 0
+        self.truncated = False
+        self._separator = separator
+        self._count = 0
+        self._buffer = io.StringIO()
+
+    def append(self, fragment: str) -> bool:
+        """Add fragment if it fits within the limit, returning whether it did."""
+        separator = self._separator if self._count else ""
+        added = len(separator) + len(fragment)
+        if self.size + added > self.limit:
+            self.truncated = True
+            return False
+
+        self._buffer.write(separator)
+        self._buffer.write(fragment)
+        self.size += added
+        self._count += 1
+        return True
+
+    def getvalue(self) -> str:
+        """Return the text built so far."""
+        return self._buffer.getvalue()
+
+
+def repr_file_content(content: FileContent) -> str:
+    """Return the same text as repr(content), without pydantic's generic repr.
+
+    Grep renders one FileContent per matching line, and walking the model
+    fields for each of them costs several times more than this direct format.
+    """
+    window = content.window
+    return (
+        f"FileContent(path={content.path!r}, contents={content.contents!r}, "
+        f"window=FileWindow(line_offset={window.line_offset}, "
+        f"line_count={window.line_count}))"
+    )
+
+
+def repr_view_output(output: ViewOutput) -> str:
+    """Return the same text as repr(output), see repr_file_content."""
+    return (
+        f"ViewOutput(view={repr_file_content(output.view)}, "
+        f"truncated={output.truncated})"
+    )
+
+
+def format_output(
+    model_name: str,
+    field: str,
+    items: Iterable[T],
+    limit: int,
+    render: Callable[[T], str] = repr,
+) -> str:
+    """Render items as `Model(field=[...], truncated=...)`, stopping at the limit.
+
+    Each item is rendered as soon as it is produced, so only the text that fits
+    is ever built; items past the limit are never consumed.
+    """
+    builder = BoundedStringBuilder(limit)
+    for item in items:
+        if not builder.append(render(item)):
+            break
+    return (
+        f"{model_name}({field}=[{builder.getvalue()}], truncated={builder.truncated})"
+    )
@@ -0,0 +1,300 @@
+"""Path enumeration that walks each directory tree once for all glob patterns."""
+
+from __future__ import annotations
+
+import glob
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path, PurePosixPath
+from typing import (
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from pydantic import PrivateAttr
+from readonly_fs_tools import GlobPattern
+from readonly_fs_tools._internal.path_enumerator import FilesystemPathEnumerator
+
+from llm_tools_readonly_fs._internal.sandbox import IndexedSandbox
+
+# Directory listings kept between calls, evicted oldest first
+DIR_CACHE_SIZE = 4096
+
+# Listings read this soon after their directory's mtime are never cached,
+# since filesystems with coarse timestamps (FAT, HFS+, some network mounts)
+# may not update the mtime for a change made within the same tick
+RACY_MTIME_WINDOW_NS = 2_000_000_000
+
+
+def split_literal_prefix(pattern: str) -> Tuple[str, str]:
+    """Split a glob pattern into its leading literal segments and wildcard tail.
+
+    `src/pkg/**/*.py` becomes `("src/pkg", "**/*.py")`; a pattern without any
+    wildcards is returned whole as the prefix with an empty tail.
+    """
+    segments = pattern.split("/")
+    for index, segment in enumerate(segments):
+        if glob.has_magic(segment):
+            return "/".join(segments[:index]), "/".join(segments[index:])
+    return pattern, ""
+
+
+def _translate_segment(segment: str) -> str:
+    """Translate a single glob path segment into a regex that never spans `/`."""
+    parts = []
+    i, n = 0, len(segment)
+    while i < n:
+        char = segment[i]
+        i += 1
+        if char == "*":
+            if not parts or parts[-1] != "[^/]*":
+                parts.append("[^/]*")
+        elif char == "?":
+            parts.append("[^/]")
+        elif char == "[":
+            j = i
+            if j < n and segment[j] == "!":
+                j += 1
+            if j < n and segment[j] == "]":
+                j += 1
+            j = segment.find("]", j)
+            if j < 0:
+                parts.append(re.escape(char))
+                continue
+            stuff = re.sub(r"([&~|\[])", r"\\\1", segment[i:j].replace("\\", "\\\\"))
+            i = j + 1
+            if stuff.startswith("!"):
+                stuff = "^/" + stuff[1:]
+            elif stuff.startswith("^"):
+                stuff = "\\" + stuff
+            parts.append(f"[{stuff}]")
+        else:
+            parts.append(re.escape(char))
+    return "".join(parts)
+
+
+def translate_glob(pattern: str) -> str:
+    """Translate a recursive glob pattern into a regex over `/`-separated paths.
+
+    `**` as a whole segment matches any number of directories, while `*`, `?`
+    and character classes stay within a single segment. Hidden names are not
+    treated specially; the sandbox decides whether they are visible.
+
+    Directories are matched with a trailing `/` as well, so that `dir/**`
+    matches dir itself the same way glob.glob does.
+    """
+    segments = pattern.split("/")
+    parts = []
+    for index, segment in enumerate(segments):
+        last = index == len(segments) - 1
+        if segment == "**":
+            parts.append(".*" if last else "(?:[^/]+/)*")
+        else:
+            # Names are never empty, so even `*` must consume a character
+            segment_regex = "(?=[^/])" + _translate_segment(segment)
+            parts.append(segment_regex + ("" if last else "/"))
+    return "".join(parts)
+
+
+def translate_glob_dirs(pattern: str) -> Optional[str]:
+    """Translate a glob pattern into a regex over the directories worth entering.
+
+    Only directories whose path can be continued into a match are accepted:
+    each non-recursive segment up to the first `**` must match the directory
+    at its own depth, and anything below that `**` is accepted. Returns None
+    when the pattern only matches entries directly below its root.
+    """
+    segments = pattern.split("/")
+    if segments[-1] != "**":
+        segments = segments[:-1]
+    regex = ""
+    for segment in reversed(segments):
+        if segment == "**":
+            regex = ".*"
+        else:
+            segment_regex = "(?=[^/])" + _translate_segment(segment)
+            regex = segment_regex + (f"(?:/{regex})?" if regex else "")
+    return regex or None
+
+
+def _nested_path(root: str, path: str) -> str:
+    """Return the part of path below root, or "" if path is not below root."""
+    root_dir = os.path.join(root, "")
+    return path[len(root_dir) :] if path.startswith(root_dir) else ""
+
+
+class WalkingPathEnumerator(FilesystemPathEnumerator):
+    """Path enumeration that expands all glob patterns in a single walk."""
+
+    _dir_cache: OrderedDict[str, Tuple[int, List[os.DirEntry]]] = PrivateAttr(
+        default_factory=OrderedDict
+    )
+    _dir_cache_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def iter_paths(self, glob_patterns: List[GlobPattern]) -> Iterable[Path]:
+        """Yield paths matching the glob patterns within sandbox constraints.
+
+        Patterns without wildcards name a single path and are answered with one
+        existence check, before any directory is scanned. Every other pattern is
+        rebased onto the directory named by its literal prefix, and patterns are
+        grouped by that root and fused into one regex per group, so every
+        directory is scanned at most once no matter how many patterns overlap it.
+        Patterns with a `..` segment after a wildcard fall back to glob.glob.
+        """
+        seen_paths: Set[Path] = set()
+        walks: Dict[str, List[Tuple[str, str]]] = {}
+
+        literal_patterns = [p for p in glob_patterns if not glob.has_magic(p)]
+        wildcard_patterns = [p for p in glob_patterns if glob.has_magic(p)]
+
+        for pattern in literal_patterns:
+            path = self.sandbox.sandbox_dir / pattern
+            if os.path.lexists(path):
+                yield from self._accept(path, seen_paths)
+
+        for pattern in wildcard_patterns:
+            # Normalize the way `sandbox_dir / pattern` would, e.g. `src/` -> `src`
+            prefix, tail = split_literal_prefix(PurePosixPath(pattern).as_posix())
+            if ".." in tail.split("/"):
+                # Directory listings never contain `..`, so a walk cannot match
+                # it after a wildcard; expand such patterns as upstream does
+                for path_str in glob.glob(
+                    str(self.sandbox.sandbox_dir / pattern),
+                    recursive=True,
+                    include_hidden=True,
+                ):
+                    yield from self._accept(Path(path_str), seen_paths)
+                continue
+            root = str(self.sandbox.sandbox_dir / prefix)
+            walks.setdefault(root, []).append((root, tail))
+            if tail == "**" and os.path.isdir(root):
+                # `dir/**` matches dir itself, as with glob.glob
+                yield from self._accept(Path(root), seen_paths)
+
+        # Fold roots nested inside another root into the outer walk
+        for root in sorted(walks, key=len):
+            for outer in walks:
+                nested = _nested_path(outer, root)
+                if nested and ".." not in nested.split("/"):
+                    walks[outer].extend(walks.pop(root))
+                    break
+
+        for root, rooted_tails in walks.items():
+            yield from self._walk_matches(root, rooted_tails, seen_paths)
+
+    def _walk_matches(
+        self, root: str, rooted_tails: List[Tuple[str, str]], seen_paths: Set[Path]
+    ) -> Iterable[Path]:
+        """Walk root once, yielding entries matched by any of the patterns."""
+        root_regex = re.escape(os.path.join(root, ""))
+        alternatives = []
+        dir_alternatives = []
+        for pattern_root, tail in rooted_tails:
+            nested = _nested_path(root, pattern_root)
+            relative = f"{nested}/{tail}" if nested else tail
+            alternatives.append(root_regex + translate_glob(relative))
+            dir_regex = translate_glob_dirs(relative)
+            if dir_regex is not None:
+                dir_alternatives.append(root_regex + dir_regex)
+        matcher = re.compile("|".join(f"(?:{alt})" for alt in alternatives), re.DOTALL)
+        descend = (
+            re.compile("|".join(f"(?:{alt})" for alt in dir_alternatives), re.DOTALL)
+            if dir_alternatives
+            else None
+        )
+
+        for entry in self._walk(root, descend):
+            path_str = entry.path
+            if matcher.fullmatch(path_str) or (
+                entry.is_dir() and matcher.fullmatch(path_str + "/")
+            ):
+                yield from self._accept(Path(path_str), seen_paths)
+
+    def _walk(
+        self, root: str, descend: Optional[re.Pattern[str]]
+    ) -> Iterator[os.DirEntry]:
+        """Yield directory entries below root, top-down.
+
+        Subdirectories are only entered when their full path matches descend,
+        so the bounded segments of a pattern prune the walk level by level
+        instead of expanding every directory below root. Hidden names are
+        skipped straight from the directory listing unless the sandbox allows
+        them, so hidden subtrees are never descended into and no entry needs a
+        stat() call to be classified. Blocked directories are skipped the same
+        way when the sandbox can tell them apart without resolving paths.
+
+        Symlinked directories are followed, as glob.glob does, unless their
+        target lies outside what the sandbox allows or was already entered
+        through a symlink further up the current path, which would loop.
+        """
+        skip_hidden = not self.sandbox.allow_hidden
+        prune_blocked = isinstance(self.sandbox, IndexedSandbox)
+        pending: List[Tuple[str, FrozenSet[str]]] = [(root, frozenset())]
+        while pending:
+            dirpath, followed = pending.pop()
+            try:
+                entries = self._scandir_cached(dirpath)
+            except OSError:
+                continue
+
+            subdirs = []
+            for entry in entries:
+                if skip_hidden and entry.name.startswith("."):
+                    continue
+                yield entry
+                if (
+                    descend is None
+                    or not descend.fullmatch(entry.path)
+                    or (prune_blocked and self.sandbox.is_blocked(entry.path))
+                ):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append((entry.path, followed))
+                elif entry.is_symlink() and entry.is_dir():
+                    target = os.path.realpath(entry.path)
+                    if target not in followed and self.sandbox.is_allowed(Path(target)):
+                        subdirs.append((entry.path, followed | {target}))
+            pending.extend(reversed(subdirs))
+
+    def _scandir_cached(self, dirpath: str) -> List[os.DirEntry]:
+        """List a directory, reusing the previous listing if it has not changed.
+
+        Adding, removing or renaming an entry updates the directory's mtime, so
+        a single stat() tells whether the cached listing is still current. Some
+        filesystems only keep coarse timestamps, so a listing read soon after
+        the last change is not cached: another change in the same tick would
+        leave the mtime as it is.
+        """
+        mtime = os.stat(dirpath).st_mtime_ns
+        with self._dir_cache_lock:
+            cached = self._dir_cache.get(dirpath)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        listed_at = time.time_ns()
+        with os.scandir(dirpath) as it:
+            entries = list(it)
+        with self._dir_cache_lock:
+            if listed_at - mtime < RACY_MTIME_WINDOW_NS:
+                # A change within the same timestamp tick would keep this mtime
+                self._dir_cache.pop(dirpath, None)
+                return entries
+            if len(self._dir_cache) >= DIR_CACHE_SIZE:
+                self._dir_cache.popitem(last=False)
+            self._dir_cache[dirpath] = (mtime, entries)
+        return entries
+
+    def _accept(self, path: Path, seen_paths: Set[Path]) -> Iterable[Path]:
+        """Yield path once if the sandbox allows it."""
+        if path not in seen_paths and self.sandbox.is_allowed(path):
+            seen_paths.add(path)
+            yield path
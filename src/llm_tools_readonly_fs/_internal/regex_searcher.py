@@ -0,0 +1,388 @@
+"""Regex searching that scans whole files with compiled, shared patterns."""
+
+from __future__ import annotations
+
+import functools
+import re
+from pathlib import Path
+from typing import (
+    Any,
+    AnyStr,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from readonly_fs_tools import FileContent, FileWindow, RegexPattern
+from readonly_fs_tools._internal.regex_searcher import StreamingRegexSearcher
+
+try:
+    from re import _parser as sre_parser
+except ImportError:  # Python < 3.11
+    import sre_parse as sre_parser
+
+try:
+    import ahocorasick
+except ImportError:  # optional speedup for literal alternations
+    ahocorasick = None
+
+# Leading bytes checked for a NUL to detect binary files
+BINARY_SNIFF_SIZE = 8192
+
+# Characters that give a regex anything other than its literal meaning
+_REGEX_SPECIAL_CHARS = frozenset("\\.^$*+?{}[]()|\n\r")
+
+
+@functools.lru_cache(maxsize=128)
+def compile_regex(search_regex: AnyStr, flags: int = 0) -> re.Pattern[AnyStr]:
+    """Compile a regex pattern, reusing the result for repeated patterns."""
+    return re.compile(search_regex, flags)
+
+
+def decode_text(data: bytes) -> str:
+    """Decode file bytes the way text-mode reading would.
+
+    Invalid UTF-8 is dropped and `\\r\\n` or lone `\\r` line endings become
+    `\\n`, matching open(..., encoding="utf-8", errors="ignore").
+    """
+    text = data.decode("utf-8", errors="ignore")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+def literal_alternatives(search_regex: str) -> Optional[Tuple[str, ...]]:
+    """Return the alternatives of a regex like `TODO|FIXME|XXX`, if that is all
+    it is: two or more non-empty literals joined by `|` with no other syntax.
+    """
+    alternatives = tuple(search_regex.split("|"))
+    if len(alternatives) < 2 or not all(alternatives):
+        return None
+    if any(_REGEX_SPECIAL_CHARS.intersection(alt) for alt in alternatives):
+        return None
+    return alternatives
+
+
+class _LiteralMatch(NamedTuple):
+    """Span of a literal hit, exposing the part of re.Match the searcher uses."""
+
+    span_start: int
+    span_end: int
+
+    def start(self) -> int:
+        return self.span_start
+
+    def end(self) -> int:
+        return self.span_end
+
+
+class LiteralSetPattern:
+    """Aho-Corasick matcher for a set of literals with an re.Pattern-like search.
+
+    Finds every literal in one pass over the text, however many literals there
+    are, where `re` would try each alternative at every position.
+    """
+
+    def __init__(self, literals: Iterable[str]) -> None:
+        self._automaton = ahocorasick.Automaton()
+        for literal in literals:
+            self._automaton.add_word(literal, len(literal))
+        self._automaton.make_automaton()
+
+    def search(self, string: str, pos: int = 0) -> Optional[_LiteralMatch]:
+        """Return the first literal hit ending at or after pos, or None."""
+        for end_index, length in self._automaton.iter(string, pos):
+            return _LiteralMatch(end_index + 1 - length, end_index + 1)
+        return None
+
+
+SearchPattern = Union[re.Pattern[str], LiteralSetPattern]
+
+
+@functools.lru_cache(maxsize=128)
+def compile_search_pattern(search_regex: str) -> SearchPattern:
+    """Compile a grep pattern into the fastest matcher that handles it.
+
+    Pure alternations of literals use Aho-Corasick when pyahocorasick is
+    installed; everything else is compiled with re.MULTILINE for whole-buffer
+    searching.
+    """
+    literals = literal_alternatives(search_regex)
+    if literals is not None and ahocorasick is not None:
+        return LiteralSetPattern(literals)
+    return compile_regex(search_regex, re.MULTILINE)
+
+
+@functools.lru_cache(maxsize=128)
+def compile_bytes_pattern(search_regex: str) -> Optional[re.Pattern[bytes]]:
+    """Compile an ASCII-only grep pattern for matching raw bytes, if possible.
+
+    Returns None for patterns with non-ASCII characters, for patterns that only
+    compile as str (such as `\\u` escapes), and for literal alternations that
+    are better served by LiteralSetPattern.
+    """
+    if not search_regex.isascii():
+        return None
+    if not isinstance(compile_search_pattern(search_regex), re.Pattern):
+        return None
+    try:
+        return compile_regex(search_regex.encode("ascii"), re.MULTILINE)
+    except re.error:
+        return None
+
+
+@functools.lru_cache(maxsize=128)
+def required_literal(search_regex: str) -> Optional[bytes]:
+    """Return the longest literal that every match of the regex contains.
+
+    Only runs of literal characters in the top-level sequence (including plain
+    groups) are considered, so the result is always a substring of any match
+    and a file without it cannot match. Returns the literal UTF-8 encoded, for
+    checking raw file bytes, or None when the regex has no such literal or
+    matches case-insensitively.
+    """
+    try:
+        parsed = sre_parser.parse(search_regex)
+    except re.error:
+        return None
+    if parsed.state.flags & re.IGNORECASE:
+        return None
+
+    longest = ""
+    run: List[str] = []
+    for op, av in _flatten_groups(parsed):
+        if op is sre_parser.AT:
+            # Zero-width anchors keep the surrounding literals adjacent
+            continue
+        char = chr(av) if op is sre_parser.LITERAL else ""
+        if char and char not in "\r\n":
+            run.append(char)
+            continue
+        longest = max(longest, "".join(run), key=len)
+        run = []
+    longest = max(longest, "".join(run), key=len)
+    return longest.encode("utf-8") if longest else None
+
+
+def _flatten_groups(items: Iterable[Tuple[Any, Any]]) -> Iterator[Tuple[Any, Any]]:
+    """Yield parsed regex items, inlining groups that do not change flags."""
+    for op, av in items:
+        if op is sre_parser.SUBPATTERN and not av[1] and not av[2]:
+            yield from _flatten_groups(av[3])
+        else:
+            yield op, av
+
+
+# Lookarounds, and anchors that can hold just past a line's newline when each
+# line is searched on its own, which a whole-buffer search never tries
+_LOOKAROUNDS = frozenset({sre_parser.ASSERT, sre_parser.ASSERT_NOT})
+_LINE_END_ANCHORS = frozenset(
+    {
+        sre_parser.AT_BEGINNING_STRING,
+        sre_parser.AT_END_STRING,
+        sre_parser.AT_NON_BOUNDARY,
+    }
+)
+
+# Character class categories that never include `\\n`
+_NEWLINE_FREE_CATEGORIES = frozenset(
+    {
+        sre_parser.CATEGORY_DIGIT,
+        sre_parser.CATEGORY_WORD,
+        sre_parser.CATEGORY_NOT_SPACE,
+        sre_parser.CATEGORY_NOT_LINEBREAK,
+    }
+)
+
+_NEWLINE = ord("\n")
+
+
+@functools.lru_cache(maxsize=128)
+def searchable_as_buffer(search_regex: str) -> bool:
+    """Return whether iter_matching_lines gives the same lines as a per-line search.
+
+    Lookarounds can see the neighbouring lines in a whole buffer, and `\\A`,
+    `\\Z` and `\\B` can match at the very end of a line searched on its own,
+    just past its newline. Other anchors (`^`, `$`, `\\b`) see the next line
+    once a match has consumed a newline, so they are only safe in patterns
+    that cannot match one. Anything else has to be searched line by line.
+    """
+    try:
+        parsed = sre_parser.parse(search_regex)
+    except re.error:
+        return False
+
+    items = list(_iter_parsed(parsed))
+    if any(
+        op in _LOOKAROUNDS or (op is sre_parser.AT and av in _LINE_END_ANCHORS)
+        for op, av in items
+    ):
+        return False
+
+    flags = parsed.state.flags
+    for op, av in items:
+        if op is sre_parser.SUBPATTERN:
+            flags |= av[1]
+    if flags & re.MULTILINE:
+        # An inline `(?m)` lets `^` match after a line's own newline
+        return False
+    dotall = bool(flags & re.DOTALL)
+    anchored = any(op is sre_parser.AT for op, _ in items)
+    return not (
+        anchored and any(_may_match_newline(op, av, dotall) for op, av in items)
+    )
+
+
+def _may_match_newline(op: Any, av: Any, dotall: bool) -> bool:
+    """Return whether a parsed regex item could consume a `\\n`, conservatively."""
+    if op is sre_parser.LITERAL:
+        return av == _NEWLINE
+    if op is sre_parser.NOT_LITERAL:
+        return av != _NEWLINE
+    if op is sre_parser.ANY:
+        return dotall
+    if op is sre_parser.IN:
+        for item_op, item_av in av:
+            if item_op is sre_parser.LITERAL and item_av != _NEWLINE:
+                continue
+            if item_op is sre_parser.RANGE and not item_av[0] <= _NEWLINE <= item_av[1]:
+                continue
+            if item_op is sre_parser.CATEGORY and item_av in _NEWLINE_FREE_CATEGORIES:
+                continue
+            return True
+        return False
+    return op in (sre_parser.GROUPREF, sre_parser.GROUPREF_EXISTS)
+
+
+def _iter_parsed(items: Iterable[Tuple[Any, Any]]) -> Iterator[Tuple[Any, Any]]:
+    """Yield every parsed regex item, including those nested in groups."""
+    for op, av in items:
+        yield op, av
+        pending = [av]
+        while pending:
+            value = pending.pop()
+            if isinstance(value, sre_parser.SubPattern):
+                yield from _iter_parsed(value)
+            elif isinstance(value, (list, tuple)):
+                pending.extend(value)
+
+
+def iter_lines(contents: str) -> Iterator[Tuple[int, str]]:
+    """Yield `(line_number, line)` for each `\\n`-terminated line of contents."""
+    line_start = 0
+    line_number = 0
+    while line_start < len(contents):
+        line_end = contents.find("\n", line_start) + 1 or len(contents)
+        yield line_number, contents[line_start:line_end]
+        line_number += 1
+        line_start = line_end
+
+
+def iter_matching_lines(
+    contents: AnyStr, pattern: SearchPattern
+) -> Iterable[Tuple[int, AnyStr]]:
+    """Yield `(line_number, line)` for each line of contents matching pattern.
+
+    The pattern is searched across the whole buffer (compile it with
+    re.MULTILINE so `^` and `$` anchor at line boundaries), resuming at the
+    next line after every hit. A hit that reaches past the newline ending its
+    line is confirmed against that line alone before being reported. For
+    patterns accepted by searchable_as_buffer, results are the same as
+    searching each line on its own.
+
+    Contents and pattern may both be bytes instead of str.
+    """
+    newline = "\n" if isinstance(contents, str) else b"\n"
+    line_pattern = (
+        compile_regex(pattern.pattern, pattern.flags & ~re.MULTILINE)
+        if isinstance(pattern, re.Pattern)
+        else pattern
+    )
+    line_number = 0
+    line_start = 0
+    while line_start < len(contents):
+        match = pattern.search(contents, line_start)
+        if match is None:
+            return
+
+        start = match.start()
+        newlines = contents.count(newline, line_start, start)
+        if newlines:
+            line_number += newlines
+            line_start = contents.rfind(newline, line_start, start) + 1
+            if line_start == len(contents):
+                # Empty match past the final newline, not on any line
+                return
+
+        line_end = contents.find(newline, start) + 1 or len(contents)
+        line = contents[line_start:line_end]
+        if (
+            match.end() < line_end
+            or not line.endswith(newline)
+            or line_pattern.search(line)
+        ):
+            yield line_number, line
+
+        line_number += 1
+        line_start = line_end
+
+
+class CachedRegexSearcher(StreamingRegexSearcher):
+    """Regex search over whole files that compiles each pattern only once."""
+
+    def iter_matches(
+        self,
+        file: Path,
+        search_regex: RegexPattern,
+    ) -> Iterable[FileContent]:
+        """Yield regex matches from file, one per matching line."""
+        self.sandbox.require_allowed(file)
+
+        compiled_pattern = compile_search_pattern(search_regex)
+        bytes_pattern = compile_bytes_pattern(search_regex)
+
+        with open(file, "rb") as f:
+            head = f.read(BINARY_SNIFF_SIZE)
+            if b"\0" in head:
+                # Binary file, as GNU grep decides; nothing useful to report
+                return
+            data = head + f.read()
+
+        literal = required_literal(search_regex)
+        if data.isascii() and b"\r" not in data:
+            # Plain ASCII text reads the same as bytes, so skip decoding it
+            if literal is not None and literal not in data:
+                return
+            if bytes_pattern is not None and searchable_as_buffer(search_regex):
+                for line_number, raw_line in iter_matching_lines(data, bytes_pattern):
+                    yield self._file_content(
+                        file, line_number, raw_line.decode("ascii")
+                    )
+                return
+
+        contents = decode_text(data)
+        # Decoding drops invalid UTF-8, which can join a literal back together
+        if literal is not None and literal.decode("utf-8") not in contents:
+            return
+        if not searchable_as_buffer(search_regex):
+            line_pattern = compile_regex(search_regex)
+            for line_number, line in iter_lines(contents):
+                if line_pattern.search(line):
+                    yield self._file_content(file, line_number, line)
+            return
+
+        for line_number, line in iter_matching_lines(contents, compiled_pattern):
+            yield self._file_content(file, line_number, line)
+
+    @staticmethod
+    def _file_content(file: Path, line_number: int, line: str) -> FileContent:
+        """Wrap a matching line as a single-line FileContent."""
+        return FileContent(
+            path=file,
+            contents=line,
+            window=FileWindow(line_offset=line_number, line_count=1),
+        )
@@ -0,0 +1,90 @@
+"""Sandbox with constant-time blocked file lookups."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Any, FrozenSet
+
+from pydantic import PrivateAttr
+from readonly_fs_tools import Sandbox
+
+
+def _resolve(p: Path) -> Path:
+    """Resolve a path, falling back to its absolute form if resolution fails."""
+    try:
+        return p.resolve()
+    except (OSError, RuntimeError):
+        return p.absolute() if not p.is_absolute() else p
+
+
+class IndexedSandbox(Sandbox):
+    """Sandbox that indexes blocked files in a frozenset.
+
+    The upstream sandbox compares every checked path against each blocked file
+    in turn, resolving a path per blocked file on every check. Here everything
+    that can be resolved up front is, so checking a path costs a single
+    resolve plus a hash lookup per parent regardless of how many files are
+    blocked. A blocked directory also blocks everything below it.
+    """
+
+    _sandbox_resolved: Path = PrivateAttr()
+    _blocked_set: FrozenSet[Path] = PrivateAttr(default_factory=frozenset)
+    _blocked_names: FrozenSet[Path] = PrivateAttr(default_factory=frozenset)
+    _blocked_spellings: FrozenSet[str] = PrivateAttr(default_factory=frozenset)
+
+    def model_post_init(self, __context: dict[str, Any] | None) -> None:
+        """Resolve the sandbox and blocked files once, during initialization."""
+        super().model_post_init(__context)
+        self._sandbox_resolved = _resolve(self.sandbox_dir)
+        self._blocked_set = frozenset(self.blocked_files)
+
+        names = set()
+        for blocked_path in self.blocked_files:
+            # Blocked names also apply at the sandbox root, as upstream, but
+            # only to that exact path and not to anything below it
+            try:
+                names.add((self._sandbox_resolved / blocked_path.name).resolve())
+            except (OSError, RuntimeError):
+                continue
+        self._blocked_names = frozenset(names)
+
+        # Blocked paths as a walk below sandbox_dir spells them, unresolved
+        spellings = {os.path.normpath(path) for path in self._blocked_set}
+        for blocked_path in self._blocked_set:
+            if blocked_path.is_relative_to(self._sandbox_resolved):
+                relative = blocked_path.relative_to(self._sandbox_resolved)
+                spellings.add(os.path.normpath(self.sandbox_dir / relative))
+        self._blocked_spellings = frozenset(spellings)
+
+    def is_blocked(self, path: str) -> bool:
+        """Check whether a path below sandbox_dir is blocked, without resolving it.
+
+        This is a cheap pre-check for directory walks, which can skip a blocked
+        directory's whole subtree; is_allowed remains the authoritative check.
+        """
+        return os.path.normpath(path) in self._blocked_spellings
+
+    def is_allowed(self, p: Path) -> bool:
+        """Check if a path is allowed within sandbox constraints."""
+        try:
+            resolved_path = _resolve(p)
+
+            if not resolved_path.is_relative_to(self._sandbox_resolved):
+                return False
+
+            if not self.allow_hidden:
+                for part in resolved_path.parts:
+                    if part.startswith(".") and part not in [".", ".."]:
+                        return False
+
+            if resolved_path in self._blocked_names:
+                return False
+            return not any(
+                path in self._blocked_set
+                for path in (resolved_path, *resolved_path.parents)
+            )
+
+        except Exception:
+            # If any unexpected error occurs, be conservative and deny access
+            return False
@@ -1,17 +1,62 @@
+import asyncio
+import contextlib
+import functools
+import os
 from pathlib import Path
-from typing import List
+from typing import List, Optional, Tuple
 
 import llm
 from llm import Toolbox
 from readonly_fs_tools import (
     FileWindow,
     Globber,
-    Grepper,
     OutputBudget,
-    Sandbox,
     Viewer,
 )
 
+from llm_tools_readonly_fs._internal.file_reader import BufferedFileReader
+from llm_tools_readonly_fs._internal.grepper import (
+    DEFAULT_GREP_WORKERS,
+    ParallelGrepper,
+)
+from llm_tools_readonly_fs._internal.output import (
+    format_output,
+    repr_file_content,
+    repr_view_output,
+)
+from llm_tools_readonly_fs._internal.path_enumerator import WalkingPathEnumerator
+from llm_tools_readonly_fs._internal.regex_searcher import CachedRegexSearcher
+from llm_tools_readonly_fs._internal.sandbox import IndexedSandbox
+
+
+@functools.lru_cache(maxsize=16)
+def _build_tools(
+    sandbox_dir: str,
+    blocked_files: Tuple[str, ...],
+    allow_hidden: bool,
+    grep_workers: int,
+) -> Tuple[Globber, ParallelGrepper, Viewer]:
+    """Build the sandboxed tools once per distinct toolbox configuration.
+
+    The tools hold no per-call state, so toolboxes created with the same
+    configuration share them. Paths must already be absolute, so that a
+    directory change cannot move the sandbox out from under shared tools.
+    """
+    sandbox = IndexedSandbox(
+        sandbox_dir=Path(sandbox_dir),
+        blocked_files=[Path(fname) for fname in blocked_files],
+        allow_hidden=allow_hidden,
+    )
+    path_enum = WalkingPathEnumerator(sandbox=sandbox)
+    globber = Globber(path_enum=path_enum)
+    grepper = ParallelGrepper(
+        path_enum=path_enum,
+        regex_searcher=CachedRegexSearcher(sandbox=sandbox),
+        workers=grep_workers,
+    )
+    viewer = Viewer(file_reader=BufferedFileReader(sandbox=sandbox))
+    return globber, grepper, viewer
+
 
 class ReadonlyFsTools(Toolbox):
     """Tools for reading and searching files in a sandboxed filesystem.
@@ -30,21 +75,23 @@ class ReadonlyFsTools(Toolbox):
     def __init__(
         self,
         *,
-        sandbox_dir: str = str(Path.cwd()),
-        blocked_files: List[str] = [],
+        sandbox_dir: Optional[str] = None,
+        blocked_files: Optional[List[str]] = None,
         allow_hidden: bool = False,
         output_limit: int = 10000,
+        grep_workers: int = DEFAULT_GREP_WORKERS,
     ) -> None:
         super().__init__()
-        sandbox = Sandbox(
-            sandbox_dir=Path(sandbox_dir),
-            blocked_files=[Path(fname) for fname in blocked_files],
-            allow_hidden=allow_hidden,
+        # Relative paths are resolved against the working directory up front,
+        # so walking and sandbox checks keep using the same root after a chdir
+        sandbox_dir = os.path.abspath(
+            os.getcwd() if sandbox_dir is None else sandbox_dir
         )
+        blocked = tuple(os.path.abspath(path) for path in blocked_files or [])
         self._output_limit = output_limit
-        self._globber = Globber.from_sandbox(sandbox)
-        self._grepper = Grepper.from_sandbox(sandbox)
-        self._viewer = Viewer.from_sandbox(sandbox)
+        self._globber, self._grepper, self._viewer = _build_tools(
+            sandbox_dir, blocked, allow_hidden, grep_workers
+        )
 
     def glob(self, glob_patterns: List[str]) -> str:
         """Find files matching glob patterns within the sandbox directory.
@@ -91,7 +138,12 @@ class ReadonlyFsTools(Toolbox):
             - Blocked files are automatically filtered out
             - Results are deduplicated if multiple patterns match the same file
         """
-        return self._globber.glob(glob_patterns, OutputBudget(limit=self._output_limit))
+        return format_output(
+            "GlobOutput",
+            "paths",
+            self._globber.path_enum.iter_paths(glob_patterns),
+            self._output_limit,
+        )
 
     def grep(self, search_regex: str, glob_patterns: List[str]) -> str:
         """Search for regex patterns within files matching glob patterns.
@@ -193,11 +245,18 @@ class ReadonlyFsTools(Toolbox):
             - Case-sensitive by default (use (?i) prefix for case-insensitive)
             - Each matching line is returned as a separate result
             - Content is searched in UTF-8 encoding with error tolerance
-            - Binary files are handled gracefully (may produce garbled text)
+            - Binary files (a NUL byte in the first 8 KiB) are skipped
         """
-        return self._grepper.grep(
-            search_regex, glob_patterns, OutputBudget(limit=self._output_limit)
-        )
+        with contextlib.closing(
+            self._grepper.iter_matches(search_regex, glob_patterns)
+        ) as matches:
+            return format_output(
+                "GrepOutput",
+                "matches",
+                matches,
+                self._output_limit,
+                render=repr_file_content,
+            )
 
     def view(
         self,
@@ -297,13 +356,42 @@ class ReadonlyFsTools(Toolbox):
             - Check file size first with glob if dealing with very large files
             - For code review, start with line_count=20-50 to get context
         """
-        return self._viewer.view(
-            Path(file_path),
-            FileWindow(line_offset=line_offset, line_count=line_count),
-            OutputBudget(limit=self._output_limit),
+        return repr_view_output(
+            self._viewer.view(
+                Path(file_path),
+                FileWindow(line_offset=line_offset, line_count=line_count),
+                OutputBudget(limit=self._output_limit),
+            )
         )
 
 
+class AsyncReadonlyFsTools(ReadonlyFsTools):
+    """Async variant of `ReadonlyFsTools` for agents that make concurrent tool calls.
+
+    Each tool runs its synchronous counterpart in a worker thread, so several
+    calls can be in flight at once without blocking the event loop.
+    """
+
+    async def glob(self, glob_patterns: List[str]) -> str:
+        return await asyncio.to_thread(super().glob, glob_patterns)
+
+    async def grep(self, search_regex: str, glob_patterns: List[str]) -> str:
+        return await asyncio.to_thread(super().grep, search_regex, glob_patterns)
+
+    async def view(
+        self,
+        file_path: str,
+        line_offset: int = 0,
+        line_count: int = 100,
+    ) -> str:
+        return await asyncio.to_thread(super().view, file_path, line_offset, line_count)
+
+    glob.__doc__ = ReadonlyFsTools.glob.__doc__
+    grep.__doc__ = ReadonlyFsTools.grep.__doc__
+    view.__doc__ = ReadonlyFsTools.view.__doc__
+
+
 @llm.hookimpl
 def register_tools(register) -> None:
     register(ReadonlyFsTools)
+    register(AsyncReadonlyFsTools)
@@ -1,9 +1,18 @@
+import asyncio
 import json
 import os
+import time
 
 import llm
+from readonly_fs_tools import (
+    FileContent,
+    FileWindow,
+    GlobOutput,
+    GrepOutput,
+    ViewOutput,
+)
 
-from llm_tools_readonly_fs import ReadonlyFsTools
+from llm_tools_readonly_fs import AsyncReadonlyFsTools, ReadonlyFsTools
 
 
 def test_glob_finds_python_files() -> None:
@@ -136,3 +145,399 @@ def test_grep_finds_imports_across_project() -> None:
     # Should find imports from both test file and main module
     common_imports = ["import json", "import llm", "from llm"]
     assert any(imp in output_str for imp in common_imports)
+
+
+def test_glob_rebases_patterns_onto_literal_prefix(tmp_path) -> None:
+    """Test glob patterns with literal leading directories, including missing ones."""
+    (tmp_path / "src" / "pkg").mkdir(parents=True)
+    (tmp_path / "src" / "pkg" / "mod.py").write_text("")
+    (tmp_path / "other.py").write_text("")
+
+    toolbox = ReadonlyFsTools(sandbox_dir=str(tmp_path))
+    output = toolbox.glob(["src/pkg/*.py", "missing/**/*.py", "other.py"])
+
+    assert output == repr(
+        GlobOutput(paths=[tmp_path / "other.py", tmp_path / "src/pkg/mod.py"])
+    )
+
+
+def test_glob_deduplicates_overlapping_patterns(tmp_path) -> None:
+    """Test that overlapping patterns report each matching path once."""
+    (tmp_path / "pkg" / "sub").mkdir(parents=True)
+    (tmp_path / "pkg" / "a.py").write_text("")
+    (tmp_path / "pkg" / "sub" / "b.py").write_text("")
+    (tmp_path / "pkg" / "sub" / "c.txt").write_text("")
+
+    toolbox = ReadonlyFsTools(sandbox_dir=str(tmp_path))
+    output = toolbox.glob(["**/*.py", "pkg/*.py", "pkg/sub/*"])
+
+    for name in ("pkg/a.py", "pkg/sub/b.py", "pkg/sub/c.txt"):
+        assert output.count(repr(tmp_path / name)) == 1
+    assert output.count("PosixPath(") == 3
+
+
+def test_glob_truncates_at_output_limit(tmp_path) -> None:
+    """Test that glob output stops at the output limit and says so."""
+    for i in range(20):
+        (tmp_path / f"file_{i:02}.txt").write_text("")
+
+    toolbox = ReadonlyFsTools(sandbox_dir=str(tmp_path), output_limit=200)
+    output = toolbox.glob(["*.txt"])
+
+    assert output.startswith("GlobOutput(paths=[PosixPath(")
+    assert output.endswith("], truncated=True)")
+    assert 0 < output.count("PosixPath(") < 20
+
+
+def test_view_reads_window_from_offset(tmp_path) -> None:
+    """Test that view returns only the requested window of lines."""
+    (tmp_path / "lines.txt").write_text("".join(f"line {i}\n" for i in range(100)))
+
+    toolbox = ReadonlyFsTools(sandbox_dir=str(tmp_path))
+    output = toolbox.view(str(tmp_path / "lines.txt"), line_offset=10, line_count=3)
+
+    assert output == repr(
+        ViewOutput(
+            view=FileContent(
+                path=tmp_path / "lines.txt",
+                contents="line 10\nline 11\nline 12\n",
+                window=FileWindow(line_offset=10, line_count=3),
+            )
+        )
+    )
+
+
+def test_toolboxes_with_same_config_share_tools(tmp_path) -> None:
+    """Test that repeated instantiation reuses the sandboxed tools."""
+    first = ReadonlyFsTools(sandbox_dir=str(tmp_path), blocked_files=["/etc/passwd"])
+    second = ReadonlyFsTools(sandbox_dir=str(tmp_path), blocked_files=["/etc/passwd"])
+    other = ReadonlyFsTools(sandbox_dir=str(tmp_path), allow_hidden=True)
+
+    assert first._grepper is second._grepper
+    assert first._grepper is not other._grepper
+
+
+def test_blocked_files_are_excluded(tmp_path) -> None:
+    """Test that blocked files are filtered from glob and grep results."""
+    (tmp_path / "public.txt").write_text("token\n")
+    (tmp_path / "secret.txt").write_text("token\n")
+
+    toolbox = ReadonlyFsTools(
+        sandbox_dir=str(tmp_path), blocked_files=[str(tmp_path / "secret.txt")]
+    )
+
+    assert toolbox.glob(["*.txt"]) == repr(GlobOutput(paths=[tmp_path / "public.txt"]))
+    assert "secret.txt" not in toolbox.grep("token", ["*.txt"])
+
+
+def test_glob_literal_patterns_match_files_and_directories(tmp_path) -> None:
+    """Test that patterns without wildcards resolve directly to existing paths."""
+    (tmp_path / "pelican").mkdir()
+    (tmp_path / "main.py").write_text("")
+
+    toolbox = ReadonlyFsTools(sandbox_dir=str(tmp_path))
+    output = toolbox.glob(["pelican", "main.py", "missing.py"])
+
+    assert output == repr(
+        GlobOutput(paths=[tmp_path / "pelican", tmp_path / "main.py"])
+    )
+
+
+def _line_match(path, line_offset: int, contents: str) -> FileContent:
+    return FileContent(
+        path=path,
+        contents=contents,
+        window=FileWindow(line_offset=line_offset, line_count=1),
+    )
+
+
+def test_grep_matches_lines_independently(tmp_path) -> None:
+    """Test that grep anchors per line and never matches across line breaks."""
+    path = tmp_path / "code.py"
+    path.write_text("import os\nx = 1  # import\n\nfoo\nbar\nimport re")
+
+    toolbox = ReadonlyFsTools(sandbox_dir=str(tmp_path))
+
+    assert toolbox.grep("^import", ["*.py"]) == repr(
+        GrepOutput(
+            matches=[
+                _line_match(path, 0, "import os\n"),
+                _line_match(path, 5, "import re"),
+            ]
+        )
+    )
+    assert toolbox.grep(r"foo\s+bar", ["*.py"]) == repr(GrepOutput(matches=[]))
+
+
+def test_hidden_directories_are_skipped_unless_allowed(tmp_path) -> None:
+    """Test that hidden entries are only listed when allow_hidden=True."""
+    (tmp_path / ".git").mkdir()
+    (tmp_path / ".git" / "config.py").write_text("")
+    (tmp_path / "visible.py").write_text("")
+
+    hidden_blocked = ReadonlyFsTools(sandbox_dir=str(tmp_path))
+    hidden_allowed = ReadonlyFsTools(sandbox_dir=str(tmp_path), allow_hidden=True)
+
+    assert hidden_blocked.glob(["**/*.py"]) == repr(
+        GlobOutput(paths=[tmp_path / "visible.py"])
+    )
+    assert repr(tmp_path / ".git/config.py") in hidden_allowed.glob(["**/*.py"])
+
+
+def test_grep_literal_alternation(tmp_path) -> None:
+    """Test grep with a pure alternation of literals, one match per line."""
+    path = tmp_path / "notes.md"
+    path.write_text("TODO: a\nnothing\nFIXME and TODO\nXXX\n")
+
+    toolbox = ReadonlyFsTools(sandbox_dir=str(tmp_path))
+
+    assert toolbox.grep("TODO|FIXME|XXX", ["*.md"]) == repr(
+        GrepOutput(
+            matches=[
+                _line_match(path, 0, "TODO: a\n"),
+                _line_match(path, 2, "FIXME and TODO\n"),
+                _line_match(path, 3, "XXX\n"),
+            ]
+        )
+    )
+
+
+def test_grep_handles_ascii_and_non_ascii_files(tmp_path) -> None:
+    """Test that grep reports the same lines for ASCII, UTF-8 and CRLF files."""
+    (tmp_path / "ascii.txt").write_bytes(b"def one():\n    pass\n")
+    (tmp_path / "utf8.txt").write_bytes("def café():\n".encode())
+    (tmp_path / "crlf.txt").write_bytes(b"x = 1\r\ndef two():\r\n")
+
+    toolbox = ReadonlyFsTools(sandbox_dir=str(tmp_path))
+    output = toolbox.grep(r"def \w+", ["*.txt"])
+
+    assert repr(_line_match(tmp_path / "ascii.txt", 0, "def one():\n")) in output
+    assert repr(_line_match(tmp_path / "utf8.txt", 0, "def café():\n")) in output
+    assert repr(_line_match(tmp_path / "crlf.txt", 1, "def two():\n")) in output
+
+
+def test_parallel_grep_matches_sequential_grep(tmp_path) -> None:
+    """Test that threaded grep returns the same ordered, truncated output."""
+    for i in range(50):
+        (tmp_path / f"file_{i:02}.py").write_text(f"def func_{i}():\n    pass\n")
+
+    def run(workers: int, output_limit: int) -> str:
+        toolbox = ReadonlyFsTools(
+            sandbox_dir=str(tmp_path), output_limit=output_limit, grep_workers=workers
+        )
+        return toolbox.grep(r"def \w+", ["*.py"])
+
+    for output_limit in (100000, 1000):
+        sequential = run(1, output_limit)
+        parallel = run(8, output_limit)
+        assert parallel == sequential
+    assert parallel.endswith("truncated=True)")
+
+
+def test_glob_reuses_listings_until_directory_changes(tmp_path, monkeypatch) -> None:
+    """Test that settled listings are cached and refreshed when a directory changes."""
+    (tmp_path / "first.py").write_text("")
+    # Backdate the directory past the racy window so its listing is cached
+    old_ns = time.time_ns() - 60_000_000_000
+    os.utime(tmp_path, ns=(old_ns, old_ns))
+
+    scandir_calls = []
+    scandir = os.scandir
+
+    def counting_scandir(path):
+        scandir_calls.append(path)
+        return scandir(path)
+
+    monkeypatch.setattr(os, "scandir", counting_scandir)
+    toolbox = ReadonlyFsTools(sandbox_dir=str(tmp_path))
+    assert toolbox.glob(["*.py"]) == repr(GlobOutput(paths=[tmp_path / "first.py"]))
+    assert len(scandir_calls) == 1
+
+    assert toolbox.glob(["*.py"]) == repr(GlobOutput(paths=[tmp_path / "first.py"]))
+    assert len(scandir_calls) == 1
+
+    (tmp_path / "first.py").unlink()
+    (tmp_path / "second.py").write_text("")
+
+    assert toolbox.glob(["*.py"]) == repr(GlobOutput(paths=[tmp_path / "second.py"]))
+    assert len(scandir_calls) == 2
+
+
+def test_glob_sees_changes_that_keep_the_directory_mtime(tmp_path) -> None:
+    """Test that a change in the same mtime tick as a listing is not missed."""
+    (tmp_path / "first.py").write_text("")
+    mtime_ns = tmp_path.stat().st_mtime_ns
+    toolbox = ReadonlyFsTools(sandbox_dir=str(tmp_path))
+    assert toolbox.glob(["*.py"]) == repr(GlobOutput(paths=[tmp_path / "first.py"]))
+
+    (tmp_path / "second.py").write_text("")
+    # Filesystems with coarse timestamps can leave the mtime unchanged
+    os.utime(tmp_path, ns=(mtime_ns, mtime_ns))
+
+    assert "second.py" in toolbox.glob(["*.py"])
+
+
+def test_grep_skips_binary_files(tmp_path) -> None:
+    """Test that files with NUL bytes near the start are not searched."""
+    (tmp_path / "text.dat").write_bytes(b"needle\n")
+    (tmp_path / "binary.dat").write_bytes(b"\x00\x01needle\n")
+
+    toolbox = ReadonlyFsTools(sandbox_dir=str(tmp_path))
+    output = toolbox.grep("needle", ["*.dat"])
+
+    assert "text.dat" in output
+    assert "binary.dat" not in output
+
+
+def test_glob_bounded_segments_match_only_their_depth(tmp_path) -> None:
+    """Test that wildcard segments before `**` only match at their own depth."""
+    for relative in ["pkg/a/mod.py", "pkg/a/deep/mod.py", "other/a/mod.py"]:
+        (tmp_path / relative).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / relative).write_text("")
+
+    toolbox = ReadonlyFsTools(sandbox_dir=str(tmp_path))
+
+    assert toolbox.glob(["p*/*/*.py"]) == repr(
+        GlobOutput(paths=[tmp_path / "pkg/a/mod.py"])
+    )
+    assert toolbox.glob(["p*/*/**/*.py"]) == repr(
+        GlobOutput(paths=[tmp_path / "pkg/a/mod.py", tmp_path / "pkg/a/deep/mod.py"])
+    )
+
+
+def test_async_tools_match_sync_tools(tmp_path) -> None:
+    """Test that the async toolbox returns the same output as the sync one."""
+    (tmp_path / "a.py").write_text("import os\n")
+    (tmp_path / "b.py").write_text("import sys\n")
+    sync_toolbox = ReadonlyFsTools(sandbox_dir=str(tmp_path))
+    async_toolbox = AsyncReadonlyFsTools(sandbox_dir=str(tmp_path))
+
+    async def run_concurrently():
+        return await asyncio.gather(
+            async_toolbox.glob(["*.py"]),
+            async_toolbox.grep("import", ["*.py"]),
+            async_toolbox.view(str(tmp_path / "a.py")),
+        )
+
+    assert asyncio.run(run_concurrently()) == [
+        sync_toolbox.glob(["*.py"]),
+        sync_toolbox.grep("import", ["*.py"]),
+        sync_toolbox.view(str(tmp_path / "a.py")),
+    ]
+
+
+def test_default_sandbox_is_working_directory_at_construction(
+    tmp_path, monkeypatch
+) -> None:
+    """Test that the default sandbox follows the working directory when created."""
+    (tmp_path / "here.py").write_text("")
+    monkeypatch.chdir(tmp_path)
+
+    toolbox = ReadonlyFsTools()
+
+    assert toolbox.glob(["*.py"]) == repr(GlobOutput(paths=[tmp_path / "here.py"]))
+
+
+def test_blocked_directories_hide_their_contents(tmp_path) -> None:
+    """Test that blocking a directory also blocks everything below it."""
+    sandbox = tmp_path / "sandbox"
+    for relative in [
+        "src/app.py",
+        "vendor/lib.py",
+        "vendor/nested/dep.py",
+        "build/lib/x.py",
+    ]:
+        (sandbox / relative).parent.mkdir(parents=True, exist_ok=True)
+        (sandbox / relative).write_text("import os\n")
+    # Only shares its name with the sandbox's build/ directory
+    (tmp_path / "elsewhere" / "build").mkdir(parents=True)
+
+    toolbox = ReadonlyFsTools(
+        sandbox_dir=str(sandbox),
+        blocked_files=[str(sandbox / "vendor"), str(tmp_path / "elsewhere" / "build")],
+    )
+
+    assert toolbox.glob(["**/*.py"]) == repr(
+        GlobOutput(paths=[sandbox / "src/app.py", sandbox / "build/lib/x.py"])
+    )
+    assert "vendor" not in toolbox.grep("import", ["**/*.py", "vendor/*.py"])
+    assert "vendor" not in toolbox.glob(["vendor/nested/dep.py"])
+    # The name alias still blocks the sandbox's build/ itself, as upstream
+    assert toolbox.glob(["build"]) == repr(GlobOutput(paths=[]))
+
+
+def test_glob_follows_symlinked_directories(tmp_path) -> None:
+    """Test that symlinked directories match regardless of the other patterns."""
+    (tmp_path / "real").mkdir()
+    (tmp_path / "real" / "a.py").write_text("")
+    (tmp_path / "top.md").write_text("")
+    (tmp_path / "link").symlink_to(tmp_path / "real", target_is_directory=True)
+    # A link back up the tree must not make the walk loop forever
+    (tmp_path / "real" / "up").symlink_to(tmp_path, target_is_directory=True)
+
+    toolbox = ReadonlyFsTools(sandbox_dir=str(tmp_path))
+
+    assert toolbox.glob(["link/*.py"]) == repr(
+        GlobOutput(paths=[tmp_path / "link" / "a.py"])
+    )
+    assert toolbox.glob(["link/*.py", "*.md"]) == repr(
+        GlobOutput(paths=[tmp_path / "top.md", tmp_path / "link" / "a.py"])
+    )
+    assert "link/a.py" in toolbox.glob(["*/*.py"])
+    assert "link/a.py" in toolbox.glob(["**/*.py"])
+
+
+def test_grep_string_anchors_and_lookarounds_apply_per_line(tmp_path) -> None:
+    """Test that `\\A` and lookbehinds see each line on its own, as upstream."""
+    path = tmp_path / "code.py"
+    path.write_text("abc\nabc\n")
+
+    toolbox = ReadonlyFsTools(sandbox_dir=str(tmp_path))
+    both_lines = repr(
+        GrepOutput(
+            matches=[_line_match(path, 0, "abc\n"), _line_match(path, 1, "abc\n")]
+        )
+    )
+
+    assert toolbox.grep(r"\Aabc", ["*.py"]) == both_lines
+    assert toolbox.grep(r"(?<!\n)abc", ["*.py"]) == both_lines
+
+
+def test_grep_required_literal_prefilter(tmp_path) -> None:
+    """Test that files are only skipped when their decoded text lacks the literal."""
+    (tmp_path / "missing.py").write_text("class Foo:\n    pass\n")
+    # Invalid UTF-8 is dropped when decoding, which joins "def" back together
+    (tmp_path / "split.py").write_bytes(b"de\x80f x\n")
+
+    toolbox = ReadonlyFsTools(sandbox_dir=str(tmp_path))
+
+    assert toolbox.grep("def", ["*.py"]) == repr(
+        GrepOutput(matches=[_line_match(tmp_path / "split.py", 0, "def x\n")])
+    )
+
+
+def test_relative_sandbox_survives_directory_change(tmp_path, monkeypatch) -> None:
+    """Test that a relative sandbox stays rooted where the toolbox was created."""
+    (tmp_path / "a" / "src").mkdir(parents=True)
+    (tmp_path / "a" / "src" / "two.py").write_text("two\n")
+    (tmp_path / "b").mkdir()
+    monkeypatch.chdir(tmp_path / "a")
+    toolbox = ReadonlyFsTools(sandbox_dir="src")
+
+    monkeypatch.chdir(tmp_path / "b")
+
+    path = tmp_path / "a" / "src" / "two.py"
+    assert toolbox.glob(["*.py"]) == repr(GlobOutput(paths=[path]))
+    assert "two" in toolbox.view(str(path))
+
+
+def test_glob_parent_segment_after_wildcard(tmp_path) -> None:
+    """Test that `..` after a wildcard segment expands as glob.glob does."""
+    (tmp_path / "pkg" / "sub").mkdir(parents=True)
+    (tmp_path / "pkg" / "a.py").write_text("")
+
+    toolbox = ReadonlyFsTools(sandbox_dir=str(tmp_path))
+
+    assert toolbox.glob(["pkg/*/../*.py"]) == repr(
+        GlobOutput(paths=[tmp_path / "pkg/sub/../a.py"])
+    )
@@ -0,0 +1,53 @@
+import random
+import re
+
+import pytest
+
+from llm_tools_readonly_fs._internal.regex_searcher import (
+    LiteralSetPattern,
+    required_literal,
+)
+
+
+@pytest.mark.parametrize(
+    ("search_regex", "expected"),
+    [
+        ("def", b"def"),
+        (r"^import os$", b"import os"),
+        (r"def \w+\(", b"def "),
+        ("(abc)d", b"abcd"),
+        ("(ab)+cd", b"cd"),
+        ("x(ab)*", b"x"),
+        ("foo|bar", None),
+        ("(?i)def", None),
+        (r"\w+", None),
+    ],
+)
+def test_required_literal(search_regex, expected) -> None:
+    """Test that only literals every match must contain are required."""
+    assert required_literal(search_regex) == expected
+
+
+def test_literal_set_pattern_search_agrees_with_re() -> None:
+    """Test that Aho-Corasick hits fall within the match re finds from pos.
+
+    The automaton reports the hit that ends first rather than the leftmost
+    one, but that hit always lies inside re's match, so both pick the same line.
+    """
+    pytest.importorskip("ahocorasick")
+    rng = random.Random(0)
+    for _ in range(500):
+        literals = sorted(
+            {"".join(rng.choices("abc", k=rng.randint(1, 3))) for _ in range(3)}
+        )
+        text = "".join(rng.choices("abc\n", k=rng.randint(0, 30)))
+        pos = rng.randint(0, len(text))
+
+        hit = LiteralSetPattern(literals).search(text, pos)
+        match = re.compile("|".join(literals)).search(text, pos)
+
+        if match is None:
+            assert hit is None
+        else:
+            assert text[hit.start() : hit.end()] in literals
+            assert match.start() <= hit.start() <= hit.end() <= match.end()